@@ -5,18 +5,27 @@ from requests.adapters import HTTPAdapter
 from requests.sessions import session
 from urllib3.util import Retry
 import json
-import struct
-import sys
 from io import BytesIO
 import img2pdf
 import os
-from PIL import Image, ImageOps
+from PIL import Image, ImageChops, ImageFilter, ImageOps
 import shutil
 import re
 import argparse
 import time
+import asyncio
+import collections
+import zipfile
+from dataclasses import dataclass, replace
+import pikepdf
 from pikepdf import _cpphelpers
 
+try:
+    # Uniquement nécessaire pour `AsyncReadly`.
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 def requests_retry_session(
     retries=3,
     backoff_factor=1,
@@ -38,6 +47,308 @@ def requests_retry_session(
     return session
 
 
+class ReadlyError(Exception):
+    """Erreur remontée par les clients Readly."""
+
+
+class PublicationError(ReadlyError):
+    """La publication n'est pas accessible (token invalide, publication inconnue...)."""
+
+
+class DownloadError(ReadlyError):
+    """Un téléchargement a échoué (code HTTP inattendu)."""
+
+    def __init__(self, message, status=None, reason=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+@dataclass
+class Page:
+    """Une page de publication.
+
+    `data` contient l'image déchiffrée, au format `format` ("webp", "jpeg"...).
+    """
+
+    publication_id: str
+    index: int
+    count: int
+    data: bytes
+    format: str
+    url: str = ""
+
+
+class DirectorySink:
+    """Enregistre chaque page dans un fichier `page_XXX.ext` d'un répertoire."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def write(self, page):
+        with open(f"{self.folder}/page_{page.index:03d}.{page.format}", "wb") as f:
+            f.write(page.data)
+
+    def close(self):
+        return self.folder
+
+    def abort(self):
+        # Les pages déjà enregistrées sont conservées (option `--no-clean`).
+        pass
+
+
+class PdfSink:
+    """Regroupe les pages dans un fichier PDF, créé à la fermeture.
+
+    Le PDF est linéarisé (« fast web view » : la première page s'affiche sans
+    attendre la fin du téléchargement), ses objets sont compressés dans des
+    flux d'objets, et il reçoit un titre, une date et des numéros de page.
+    """
+
+    def __init__(self, path, dpi=0, infos=None):
+        self.path = path
+        self.dpi = dpi
+        self.infos = infos or {}
+        self.pages = []
+
+    def write(self, page):
+        self.pages.append(bytes(page.data))
+
+    def close(self):
+        # Le PDF brut est écrit dans un fichier temporaire (et non en mémoire) : pikepdf
+        # le relit depuis le disque, sans garder une copie de plus de la publication.
+        tmp_file = f"{self.path}.tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                if self.dpi:
+                    img2pdf.convert(self.pages, dpi=self.dpi, outputstream=f)
+                else:
+                    img2pdf.convert(self.pages, outputstream=f)
+            self.pages = []
+            with pikepdf.open(tmp_file) as pdf:
+                self.set_metadata(pdf)
+                pdf.Root.PageLabels = pdf.make_indirect(
+                    pikepdf.Dictionary(Nums=pikepdf.Array([0, pikepdf.Dictionary(S=pikepdf.Name.D)]))
+                )
+                pdf.save(
+                    self.path,
+                    linearize=True,
+                    compress_streams=True,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                )
+        finally:
+            self.pages = []
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        return self.path
+
+    def set_metadata(self, pdf):
+        if "title" not in self.infos:
+            return
+        title = self.infos["title"]
+        if self.infos.get("issue") and self.infos["issue"] != self.infos.get("date"):
+            title = f"{title} - {self.infos['issue']}"
+        with pdf.open_metadata(set_pikepdf_as_editor=False) as meta:
+            meta["dc:title"] = title
+            if self.infos.get("date"):
+                meta["xmp:CreateDate"] = self.infos["date"]
+        pdf.Root.ViewerPreferences = pikepdf.Dictionary(DisplayDocTitle=True)
+
+    def abort(self):
+        self.pages = []
+        # Fichier éventuellement écrit en partie par `close()`.
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CbzSink:
+    """Ajoute les pages, au fil de l'eau, dans une archive CBZ."""
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+
+    def write(self, page):
+        self.zip.writestr(f"page_{page.index:03d}.{page.format}", page.data)
+
+    def close(self):
+        self.zip.close()
+        return self.path
+
+    def abort(self):
+        self.zip.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CallableSink:
+    """Transmet chaque page à une fonction (stockage objet, file de messages...)."""
+
+    def __init__(self, func, on_close=None, on_abort=None):
+        self.func = func
+        self.on_close = on_close
+        self.on_abort = on_abort
+
+    def write(self, page):
+        self.func(page)
+
+    def close(self):
+        return self.on_close() if self.on_close else None
+
+    def abort(self):
+        if self.on_abort:
+            self.on_abort()
+
+
+def decode_content(content, publication_id):
+    """Déchiffre un contenu (page ou article) téléchargé depuis Readly.
+
+    Parameters
+    ----------
+    content : bytes
+        Le contenu chiffré.
+    publication_id : str
+        L'identifiant de la publication, qui sert de clé.
+
+    Returns
+    -------
+    bytearray
+        Le contenu déchiffré.
+    """
+    size = len(content)
+    key = publication_id.encode()
+    key = (key * (size // len(key) + 1))[:size]
+    # XOR de tout le buffer d'un coup, via des entiers (beaucoup plus rapide qu'une boucle par octet).
+    result = int.from_bytes(content, "big") ^ int.from_bytes(key, "big")
+    return bytearray(result.to_bytes(size, "big"))
+
+
+def sample_image(im, size=256):
+    """Réduit une image par échantillonnage (et non moyenne) : un texte noir sur blanc le reste."""
+    ratio = min(1, size / max(im.size))
+    return im.resize((max(1, int(im.width * ratio)), max(1, int(im.height * ratio))), Image.NEAREST)
+
+
+def get_ink_paper_levels(histogram):
+    """Niveaux de l'encre (1 % des pixels les plus sombres) et du papier (1 % des plus clairs).
+
+    Parameters
+    ----------
+    histogram : list
+        L'histogramme d'une image en niveaux de gris ("L").
+
+    Returns
+    -------
+    tuple
+        Les niveaux `(ink, paper)`.
+    """
+    total = sum(histogram)
+    ink, count = 0, 0
+    while count + histogram[ink] < 0.01 * total:
+        count += histogram[ink]
+        ink += 1
+    paper, count = 255, 0
+    while count + histogram[paper] < 0.01 * total:
+        count += histogram[paper]
+        paper -= 1
+    return ink, paper
+
+
+def detect_color_mode(
+    im, size=256, chroma_tolerance=6, paper_tint=16, max_midtones=0.07, max_ink=96, max_flat_midtones=0.005
+):
+    """Détermine le mode couleur adapté à une image, à partir d'une version réduite.
+
+    Parameters
+    ----------
+    im : PIL.Image.Image
+        L'image à analyser.
+    size : int
+        La taille (en pixels) du plus grand côté de l'image réduite analysée.
+    chroma_tolerance : int
+        L'écart maximal de chrominance (au neutre, ou à la teinte du papier) pour qu'un pixel soit considéré gris.
+    paper_tint : int
+        L'écart maximal au neutre de la teinte dominante (papier journal) pour qu'elle soit ignorée.
+    max_midtones : float
+        La part maximale de pixels intermédiaires (entre le papier et l'encre) d'une page noir et blanc.
+    max_ink : int
+        Le niveau maximal de l'encre d'une page noir et blanc (au-delà, le texte est gris).
+    max_flat_midtones : float
+        La part maximale de pixels intermédiaires entourés d'autres pixels intermédiaires
+        (zones continues, comme une photo) d'une page noir et blanc.
+
+    Returns
+    -------
+    str
+        "RGB" (couleur), "L" (niveaux de gris) ou "1" (noir et blanc).
+    """
+    small = sample_image(im, size)
+    total = small.width * small.height
+    if small.mode not in ("1", "L"):
+        _, cb, cr = small.convert("YCbCr").split()
+        for channel in (cb, cr):
+            histogram = channel.histogram()
+            neutral = set(range(128 - chroma_tolerance, 128 + chroma_tolerance + 1))
+            tint = histogram.index(max(histogram))
+            if abs(tint - 128) <= paper_tint:
+                neutral.update(range(tint - chroma_tolerance, tint + chroma_tolerance + 1))
+            if sum(histogram[v] for v in neutral) < 0.995 * total:
+                return "RGB"
+    # Noir et blanc : une encre sombre, et peu de pixels dans la moitié centrale entre le
+    # papier et l'encre, quelles que soient leurs teintes.
+    gray = small.convert("L")
+    histogram = gray.histogram()
+    ink, paper = get_ink_paper_levels(histogram)
+    quarter = (paper - ink) // 4
+    if ink > max_ink or paper - ink < 64:
+        return "L"
+    if sum(histogram[ink + quarter : paper - quarter + 1]) >= max_midtones * total:
+        return "L"
+    # Les pixels intermédiaires d'un texte (bords antialiasés) sont voisins du papier ou de
+    # l'encre ; ceux d'une photo, même petite, forment des zones continues.
+    midtones = gray.point(lambda v: 255 if ink + quarter <= v <= paper - quarter else 0)
+    spread = ImageChops.subtract(gray.filter(ImageFilter.MaxFilter(3)), gray.filter(ImageFilter.MinFilter(3)))
+    flat = spread.point(lambda v: 255 if v < quarter else 0)
+    if ImageChops.darker(midtones, flat).histogram()[255] >= max_flat_midtones * total:
+        return "L"
+    return "1"
+
+
+class EncodeReport:
+    """Statistiques d'encodage des pages d'une publication."""
+
+    def __init__(self):
+        self.modes = {}
+        self.size = 0
+        self.encode_time = 0.0
+        self.baseline_size = 0
+        self.baseline_time = 0.0
+        self.measured = False
+
+    def add(self, mode, size, encode_time, baseline_size=None, baseline_time=None):
+        self.modes[mode] = self.modes.get(mode, 0) + 1
+        self.size += size
+        self.encode_time += encode_time
+        if baseline_size is None:
+            baseline_size, baseline_time = size, encode_time
+        else:
+            self.measured = True
+        self.baseline_size += baseline_size
+        self.baseline_time += baseline_time
+
+    def summary(self):
+        names = {"RGB": "color", "L": "grayscale", "1": "black & white"}
+        modes = ", ".join(f"{n} {names.get(m, m)}" for m, n in self.modes.items())
+        txt = f"[INFO] Pages: {modes} | Output: {self.size / 1024 / 1024:.1f} MB | Encode time: {self.encode_time:.1f}s"
+        if self.measured:
+            txt += (
+                f" | Saved vs RGB: {(self.baseline_size - self.size) / 1024 / 1024:.1f} MB,"
+                f" {self.baseline_time - self.encode_time:.1f}s"
+            )
+        return txt
+
+
 class Readly:
     token: str = ""
     user_agent: str = "okhttp/3.12.1"
@@ -52,6 +363,10 @@ class Readly:
     pause_sec = 0
     resolution = 2400
     dpi = 0
+    color_mode = "auto"
+    jpeg_optimize = False
+    jpeg_progressive = False
+    measure_savings = False
     session = requests.Session()
 
     def __init__(self, token, user_agent="okhttp/3.12.1") -> None:
@@ -59,111 +374,229 @@ class Readly:
         self.user_agent = user_agent
 
     def decode(self, content, publication_id):
-        filesize = len(content)
-        unpacked = struct.unpack("c" * filesize, content)
-        result = []
-        for i, u in enumerate(unpacked):
-            char = ord(unpacked[i]) ^ ord(publication_id[i % len(publication_id)])
-            result.append(char)
+        return decode_content(content, publication_id)
 
-        return bytearray(result)
+    def get_download_format(self):
+        return "jpeg" if self.use_default else "webp"
 
-    def download_publication(self, publication_id, save_as=""):
-        download_format = "webp"
-        if self.use_default:
-            download_format = "jpeg"
-        url = f"https://api.readly.com/issue/{publication_id}/content?format={download_format}&r={self.resolution}"
+    def get_issue_content(self, publication_id):
+        """Récupère la liste des pages et articles d'une publication."""
+        url = f"https://api.readly.com/issue/{publication_id}/content?format={self.get_download_format()}&r={self.resolution}"
         headers = {
             "X-Auth-Token": self.token,
             "User-Agent": self.user_agent,
         }
-        params = ()
 
-        r = requests_retry_session(session=self.session).get(
-            url,
-            # cookies=s.cookies,
-            allow_redirects=True,
-            headers=headers,
-            params=params,
-        )
-        full_content = json.loads(r.text)
-        if not full_content['success']:
-            print("[ERROR] Can't get publication. Please check your token.")
-            sys.exit()
+        try:
+            r = requests_retry_session(session=self.session).get(
+                url,
+                allow_redirects=True,
+                headers=headers,
+            )
+        except requests.RequestException as e:
+            raise DownloadError(f"Can't get publication: {e}") from e
+        try:
+            full_content = json.loads(r.text) if r.text else {}
+        except ValueError as e:
+            raise PublicationError("Can't get publication: invalid response.") from e
+        if not full_content.get("success"):
+            raise PublicationError("Can't get publication. Please check your token.")
+        return full_content
+
+    def download_page(self, url, publication_id):
+        """Télécharge et déchiffre une page (ou un article)."""
+        try:
+            r = requests_retry_session(session=self.session).get(url)
+        except requests.RequestException as e:
+            # Erreur de connexion, ou code HTTP 5xx après toutes les tentatives.
+            raise DownloadError(f"Can't download page: {e}") from e
+        if r.status_code != 200:
+            raise DownloadError(f"Can't download page: {r.status_code} {r.reason}", r.status_code, r.reason)
+        return self.decode(r.content, publication_id)
+
+    def iter_pages(self, publication_id, full_content=None):
+        """Générateur des pages déchiffrées (objets `Page`), dans l'ordre.
+
+        Les pages sont téléchargées à la demande : rien n'est écrit sur le disque.
+        """
+        if full_content is None:
+            full_content = self.get_issue_content(publication_id)
+        content = full_content["content"]
+        for i, c_url in enumerate(content):
+            if i and self.pause_sec:
+                time.sleep(self.pause_sec)
+            yield Page(
+                publication_id,
+                i,
+                len(content),
+                self.download_page(c_url, publication_id),
+                self.get_download_format(),
+                c_url,
+            )
+
+    def iter_articles(self, publication_id, full_content=None):
+        """Générateur des articles (archives zip déchiffrées) : `(key, data)`."""
+        if full_content is None:
+            full_content = self.get_issue_content(publication_id)
+        for i, a in enumerate(full_content.get("articles", [])):
+            if i and self.pause_sec:
+                time.sleep(self.pause_sec)
+            yield a["key"], self.download_page(a["url"], publication_id)
+
+    def save_image(self, im, img_format, **options):
+        out = BytesIO()
+        if self.dpi:
+            options["dpi"] = (self.dpi, self.dpi)
+        im.save(out, img_format, **options)
+        return out.getvalue()
+
+    def transcode(self, page, report=None):
+        """Convertit une page dans le format d'image demandé (`img_format`).
+
+        Avec `color_mode = "auto"`, les pages en niveaux de gris sont enregistrées
+        en 8 bits ("L"). Pour un conteneur PDF, les pages noir et blanc sont
+        enregistrées en 1 bit (TIFF CCITT G4, intégré tel quel dans le PDF).
+        """
+        if self.use_default:
+            return page
+        im = Image.open(BytesIO(page.data))
+        im.load()
+        start = time.perf_counter()
+        mode = "RGB"
+        if self.color_mode == "auto":
+            mode = detect_color_mode(im)
+            if mode == "1" and self.container_format.upper() != "PDF":
+                mode = "L"
+            # Le format WEBP ne stocke que de la couleur : inutile de convertir en niveaux de gris.
+            if mode == "L" and self.img_format.upper() == "WEBP":
+                mode = "RGB"
+        options = {"quality": self.img_quality}
+        if self.img_format.upper() == "JPEG":
+            options.update(optimize=self.jpeg_optimize, progressive=self.jpeg_progressive)
+        if mode == "1":
+            # Seuil à mi-chemin entre l'encre et le papier mesurés sur la page.
+            ink, paper = get_ink_paper_levels(sample_image(im).convert("L").histogram())
+            threshold = (ink + paper) // 2
+            bilevel = im.convert("L").point(lambda v: 255 if v > threshold else 0).convert("1")
+            img_format = "tiff"
+            data = self.save_image(bilevel, "TIFF", compression="group4")
+        else:
+            img_format = self.img_format
+            data = self.save_image(im.convert(mode), img_format, **options)
+        encode_time = time.perf_counter() - start
+
+        if report is not None:
+            baseline_size = baseline_time = None
+            if self.measure_savings and (mode != "RGB" or options.get("optimize") or options.get("progressive")):
+                start = time.perf_counter()
+                baseline_size = len(self.save_image(im.convert("RGB"), self.img_format, quality=self.img_quality))
+                baseline_time = time.perf_counter() - start
+            report.add(mode, len(data), encode_time, baseline_size, baseline_time)
+        return replace(page, data=data, format=img_format)
+
+    def get_sinks(self, save_as, infos=None):
+        """Prépare les destinations des pages selon la configuration."""
+        sinks = []
+        if self.no_clean:
+            sinks.append(DirectorySink(f"{self.output_folder}/{save_as}"))
+        if self.container_format.upper() == "PDF":
+            if self.img_format.upper() == "WEBP" and not self.use_default:
+                print(
+                    "[WARNING] Image format \"WEBP\" is not optimized for PDF container. The output file may be large."
+                )
+            sinks.append(PdfSink(self.get_unique_path(self.output_folder, save_as, "pdf"), self.dpi, infos))
+        if self.container_format.upper() == "CBZ":
+            sinks.append(CbzSink(self.get_unique_path(self.output_folder, save_as, "cbz")))
+        return sinks
+
+    def download_publication(self, publication_id, save_as="", sinks=None, infos=None):
+        """Télécharge une publication.
+
+        Parameters
+        ----------
+        publication_id : str
+            L'identifiant de la publication.
+        save_as : str
+            Le nom (sans extension) des fichiers de sortie.
+        sinks : list
+            Destinations des pages (`write(page)` / `close()`, et éventuellement
+            `abort()`, appelée si le téléchargement échoue). Par défaut, elles
+            sont déduites de la configuration (`container_format`, `no_clean`).
+        infos : dict
+            Les informations de la publication (`get_infos`), utilisées pour les
+            métadonnées du PDF. Récupérées si elles ne sont pas fournies.
+
+        Returns
+        -------
+        EncodeReport
+            Les statistiques d'encodage des pages.
+
+        Raises
+        ------
+        PublicationError
+            Si la publication n'est pas accessible.
+        DownloadError
+            Si une page ou un article ne peut pas être téléchargé.
+        """
+        full_content = self.get_issue_content(publication_id)
 
         if not save_as:
             save_as = publication_id
+        os.makedirs(self.output_folder, exist_ok=True)
         tmp_output_folder = f"{self.output_folder}/{save_as}"
-        os.makedirs(tmp_output_folder, exist_ok=True)
+        # Seul le répertoire créé ici (pour les articles) est supprimé à la fin.
+        created_tmp_folder = False
+        custom_sinks = sinks is not None
+        report = EncodeReport()
         if self.get_content:
-            content = full_content["content"]
-            for i, c_url in enumerate(content):
-                print(f"Downloading page {i+1} / {len(content)}", end="\r")
-                r = requests_retry_session(session=self.session).get(c_url)
-                if r.status_code != 200:
-                    print(f"[ERRRO] Can't download page: {r.status_code} {r.reason}")
-                    sys.exit()
-                page = f"000{i}"[-3:]
-                current_file = f"{tmp_output_folder}/page_{page}.{self.img_format}"
-                if self.use_default:
-                    with open(current_file, "wb") as im:
-                        bits = BytesIO(self.decode(r.content, publication_id))
-                        im.write(bits.getbuffer())
-                else:
-                    im = Image.open(BytesIO(self.decode(r.content, publication_id)))
-                    im = im.convert("RGB")
-                    if self.dpi:
-                        im.save(current_file, self.img_format, quality=self.img_quality, dpi=(self.dpi, self.dpi))
-                    else:
-                        im.save(current_file, self.img_format, quality=self.img_quality)
-                time.sleep(self.pause_sec)
+            if sinks is None:
+                if infos is None and self.container_format.upper() == "PDF":
+                    infos = self.get_infos(publication_id)
+                sinks = self.get_sinks(save_as, infos)
+            try:
+                for page in self.iter_pages(publication_id, full_content):
+                    print(f"Downloading page {page.index+1} / {page.count}", end="\r")
+                    page = self.transcode(page, report)
+                    for sink in sinks:
+                        sink.write(page)
+            except BaseException:
+                # Pas de fichier incomplet qui ressemblerait à une publication entière.
+                print()
+                for sink in sinks:
+                    if hasattr(sink, "abort"):
+                        sink.abort()
+                raise
             print()
+            for i, sink in enumerate(sinks):
+                try:
+                    output = sink.close()
+                except BaseException:
+                    # Les destinations pas encore fermées (et celle en échec) sont abandonnées.
+                    for other in sinks[i:]:
+                        if hasattr(other, "abort"):
+                            other.abort()
+                    raise
+                if output and not isinstance(sink, DirectorySink):
+                    print(f'"{output}" successfully created!')
+            if not self.use_default:
+                print(report.summary())
 
         if self.get_articles:
             if "articles" in full_content:
+                created_tmp_folder = not os.path.isdir(tmp_output_folder)
+                os.makedirs(tmp_output_folder, exist_ok=True)
                 articles = full_content["articles"]
-                for i, a in enumerate(articles):
+                for i, (key, article) in enumerate(self.iter_articles(publication_id, full_content)):
                     print(f"Page {i+1} / {len(articles)}", end="\r")
-                    r = requests_retry_session(session=self.session).get(a["url"])
-                    with open(f"{tmp_output_folder}/article_{a['key']}.zip", "wb") as f:
-                        f.write(self.decode(r.content, publication_id))
-                    time.sleep(self.pause_sec)
+                    with open(f"{tmp_output_folder}/article_{key}.zip", "wb") as f:
+                        f.write(article)
                 print()
             else:
                 print("[INFO] No articles found.")
 
-        if self.get_content and self.container_format.upper() == "PDF".upper():
-            print("PDF creation...")
-            if self.img_format.upper() == "WEBP".upper():
-                print(
-                    "[WARNING] Image format \"WEBP\" is not optimized for PDF container. The output file may be large."
-                )
-            pdf_file = self.get_unique_path(self.output_folder, save_as, "pdf")
-            with open(pdf_file, "wb") as f:
-                imgs = []
-                for fname in os.listdir(tmp_output_folder):
-                    if not fname.endswith(f".{self.img_format}"):
-                        continue
-                    path = os.path.join(tmp_output_folder, fname)
-                    if os.path.isdir(path):
-                        continue
-                    imgs.append(path)
-                if self.dpi:
-                    f.write(img2pdf.convert(imgs, dpi=self.dpi))
-                else:
-                    f.write(img2pdf.convert(imgs))
-            print(f'"{pdf_file}" successfully created!')
-
-        if self.get_content and self.container_format.upper() == "CBZ".upper():
-            print("CBZ creation...")
-            zip_file = self.get_unique_path(self.output_folder, save_as, "zip")
-            shutil.make_archive(zip_file[:-4], "zip", tmp_output_folder)
-            cbz_file = self.get_unique_path(self.output_folder, save_as, "cbz")
-            os.rename(zip_file, cbz_file)
-            print(f'"{cbz_file}" successfully created!')
-
-        if not self.no_clean:
+        if not self.no_clean and created_tmp_folder and not custom_sinks:
             shutil.rmtree(tmp_output_folder)
+        return report
 
     def get_unique_path(self, folder, name, ext):
         filler_txt = ""
@@ -266,3 +699,204 @@ class Readly:
             return False
         infos = json.loads(r.text)
         return infos['loginResponse']['token']
+
+
+class AsyncReadly:
+    """Client asynchrone (asyncio) avec la même interface que `Readly`.
+
+    Toutes les requêtes partagent une même session `aiohttp` et un même
+    sémaphore : `concurrency` borne le nombre de requêtes en vol, quel que
+    soit le nombre de publications traitées en parallèle.
+
+    Exemple
+    -------
+    async with AsyncReadly(token, concurrency=64) as rdly:
+        async for page in rdly.iter_pages(publication_id):
+            ...
+    """
+
+    user_agent: str = "okhttp/3.12.1"
+    use_default = False
+    resolution = 2400
+    retries = 3
+    backoff_factor = 1
+    status_forcelist = (500, 502, 504)
+    # Au-delà de cette taille (en octets), le déchiffrement est fait hors de la boucle d'événements.
+    executor_threshold = 256 * 1024
+
+    def __init__(self, token, user_agent="okhttp/3.12.1", concurrency=16, session=None) -> None:
+        self.token = token
+        self.user_agent = user_agent
+        self.concurrency = concurrency
+        self.session = session
+        self._own_session = session is None
+        self._semaphore = None
+        if aiohttp is None:
+            raise ImportError('AsyncReadly requires "aiohttp" (pip install aiohttp).')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        # Créés ici (et non dans `__init__`) pour être liés à la boucle d'événements en cours.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    def _headers(self):
+        return {
+            "X-Auth-Token": self.token,
+            "User-Agent": self.user_agent,
+        }
+
+    async def _get(self, url, headers=None):
+        """Requête GET avec la même politique de relance que `requests_retry_session`.
+
+        Returns
+        -------
+        tuple
+            Le code HTTP, la raison et le contenu brut de la réponse.
+
+        Raises
+        ------
+        DownloadError
+            Si la connexion échoue encore après `retries` tentatives.
+        """
+        session = self._get_session()
+        for attempt in range(self.retries + 1):
+            async with self._semaphore:
+                try:
+                    async with session.get(url, headers=headers, allow_redirects=True) as r:
+                        body = await r.read()
+                        status, reason = r.status, r.reason
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt >= self.retries:
+                        raise DownloadError(f"Can't download {url}: {e!r}") from e
+                    status = None
+            if status is not None and (status not in self.status_forcelist or attempt >= self.retries):
+                return status, reason, body
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def _get_json(self, url):
+        status, reason, body = await self._get(url, headers=self._headers())
+        if not body:
+            return None
+        return json.loads(body)
+
+    def decode(self, content, publication_id):
+        return decode_content(content, publication_id)
+
+    def get_download_format(self):
+        return "jpeg" if self.use_default else "webp"
+
+    async def get_issue_content(self, publication_id):
+        """Récupère la liste des pages et articles d'une publication."""
+        url = f"https://api.readly.com/issue/{publication_id}/content?format={self.get_download_format()}&r={self.resolution}"
+        try:
+            full_content = await self._get_json(url)
+        except ValueError as e:
+            raise PublicationError("Can't get publication: invalid response.") from e
+        if not full_content or not full_content.get("success"):
+            raise PublicationError("Can't get publication. Please check your token.")
+        return full_content
+
+    async def download_page(self, url, publication_id):
+        """Télécharge et déchiffre une page (ou un article)."""
+        status, reason, body = await self._get(url)
+        if status != 200:
+            raise DownloadError(f"Can't download page: {status} {reason}", status, reason)
+        if len(body) > self.executor_threshold:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.decode, body, publication_id)
+        return self.decode(body, publication_id)
+
+    async def _iter_downloads(self, urls, publication_id):
+        """Télécharge les URLs en gardant au plus `concurrency` téléchargements d'avance.
+
+        Une nouvelle tâche n'est lancée que lorsqu'un résultat est rendu : le nombre
+        de pages gardées en mémoire reste borné, même si le consommateur est lent.
+        """
+        pending = collections.deque()
+        next_index = 0
+        try:
+            for i in range(len(urls)):
+                while next_index < len(urls) and len(pending) < self.concurrency:
+                    pending.append(asyncio.ensure_future(self.download_page(urls[next_index], publication_id)))
+                    next_index += 1
+                yield i, await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def iter_pages(self, publication_id, full_content=None):
+        """Itère sur les pages déchiffrées (objets `Page`), dans l'ordre.
+
+        Au plus `concurrency` pages sont demandées d'avance ; chaque page est
+        rendue dès qu'elle et ses précédentes sont arrivées.
+        """
+        if full_content is None:
+            full_content = await self.get_issue_content(publication_id)
+        content = full_content["content"]
+        # Fermeture explicite : sinon les téléchargements en cours survivent à l'itérateur.
+        downloads = self._iter_downloads(content, publication_id)
+        try:
+            async for i, data in downloads:
+                yield Page(publication_id, i, len(content), data, self.get_download_format(), content[i])
+        finally:
+            await downloads.aclose()
+
+    async def iter_articles(self, publication_id, full_content=None):
+        """Itère sur les articles (archives zip déchiffrées) d'une publication."""
+        if full_content is None:
+            full_content = await self.get_issue_content(publication_id)
+        articles = full_content.get("articles", [])
+        downloads = self._iter_downloads([a["url"] for a in articles], publication_id)
+        try:
+            async for i, article in downloads:
+                yield articles[i]["key"], article
+        finally:
+            await downloads.aclose()
+
+    async def get_infos(self, publication_id):
+        url = f"https://d3og6tlt23zks5.cloudfront.net/content/{publication_id}"
+        status, reason, body = await self._get(url, headers=self._headers())
+        text = body.decode("utf-8", errors="replace")
+        if not text or "NOT FOUND" in text.upper():
+            return False
+        infos = json.loads(text)
+        infos["date"] = infos["publish_date"][: len("YYYY-MM-DD")]
+        if "issue" not in infos:
+            infos["issue"] = infos["date"]
+        return infos
+
+    async def get_all_publications(self, magazine_id):
+        for pub_type in ["magazines", "newspapers"]:
+            url = f"https://d3og6tlt23zks5.cloudfront.net/{pub_type}/{magazine_id}"
+            infos = await self._get_json(url)
+            if not infos:
+                continue
+            return [
+                {
+                    "id": c["id"],
+                    "title": c["title"],
+                    "issue": c["issue"] if "issue" in c else c["publish_date"][: len("YYYY-MM-DD")],
+                    "date": c["publish_date"][: len("YYYY-MM-DD")],
+                }
+                for c in infos["content"]
+            ]
+
+    async def is_token_ok(self):
+        infos = await self._get_json("https://api.readly.com/subscriptions")
+        return bool(infos) and "subscriptions" in infos and infos["subscriptions"][0]["isActive"]
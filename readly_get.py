@@ -124,6 +124,31 @@ if __name__ == "__main__":
         default=300,
         help='Image DPI (0 = original DPI). Default="300".',
     )
+    parser.add_argument(
+        "--color-mode",
+        type=str,
+        choices=["auto", "rgb"],
+        default="auto",
+        help='Color mode of saved pages ("auto" = grayscale / black & white pages are detected, "rgb" = always color). Default="auto".',
+    )
+    parser.add_argument(
+        "--optimize-jpeg",
+        action="store_true",
+        default=False,
+        help="Optimize JPEG encoding (smaller files, slower encoding).",
+    )
+    parser.add_argument(
+        "--progressive-jpeg",
+        action="store_true",
+        default=False,
+        help="Save progressive JPEG images.",
+    )
+    parser.add_argument(
+        "--measure-savings",
+        action="store_true",
+        default=False,
+        help='Also encode pages in plain RGB to report size and time saved by "--color-mode auto" (slower).',
+    )
     parser.add_argument("--user-agent", type=str, default=None, help="User-agent to use.")
     parser.add_argument(
         "--pause",
@@ -180,6 +205,10 @@ if __name__ == "__main__":
     container_format = args.container_format
     use_default = args.low_quality
     dpi = args.dpi
+    color_mode = args.color_mode
+    jpeg_optimize = args.optimize_jpeg
+    jpeg_progressive = args.progressive_jpeg
+    measure_savings = args.measure_savings
     pause_sec = args.pause
     no_clean = args.no_clean
     version = args.version
@@ -267,6 +296,10 @@ if __name__ == "__main__":
     rdly.get_articles = get_articles
     rdly.dpi = dpi
     rdly.use_default = use_default
+    rdly.color_mode = color_mode
+    rdly.jpeg_optimize = jpeg_optimize
+    rdly.jpeg_progressive = jpeg_progressive
+    rdly.measure_savings = measure_savings
 
     is_command_line = True
 
@@ -336,8 +369,13 @@ if __name__ == "__main__":
             else:
                 print(f"[INFO] Image format: {image_format.upper()}")
                 print(f"[INFO] Image quality : {quality}")
+                print(f"[INFO] Color mode : {color_mode.upper()}")
                 print(f"[INFO] Container format : {container_format.upper()}")
-            rdly.download_publication(publication_id, save_as=output_filename)
+            try:
+                rdly.download_publication(publication_id, save_as=output_filename, infos=infos)
+            except readly.ReadlyError as e:
+                print(f"[ERROR] {e}")
+                sys.exit()
 
         # Lecture des infos.
         infos = rdly.get_infos(publication_id)
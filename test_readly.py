@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw
+
+import readly
+
+
+def text_page(scale, paper=(255, 255, 255), ink=(0, 0, 0), size=(1200, 1600)):
+    """Page de texte antialiasé (traits de `scale` pixels), passée par un encodage WEBP."""
+    factor = 2
+    small = Image.new("RGB", (size[0] // scale, size[1] // scale), paper)
+    d = ImageDraw.Draw(small)
+    d.fontmode = "1"
+    for y in range(10, small.height - 20, 16):
+        d.text((10, y), "Lorem ipsum dolor sit amet, consectetur adipiscing elit " * 4, fill=ink)
+    big = small.resize((small.width * scale * factor, small.height * scale * factor), Image.NEAREST)
+    # Légère inclinaison, comme sur une page numérisée : les bords des caractères sont antialiasés.
+    big = big.rotate(0.7, Image.BICUBIC, fillcolor=paper)
+    im = big.resize(size, Image.LANCZOS)
+    out = BytesIO()
+    im.save(out, "webp", quality=80)
+    return Image.open(BytesIO(out.getvalue()))
+
+
+def test_text_page_is_bilevel():
+    for scale in (3, 4, 6):
+        assert readly.detect_color_mode(text_page(scale)) == "1"
+
+
+def test_newsprint_page_is_bilevel():
+    assert readly.detect_color_mode(text_page(3, paper=(236, 228, 208), ink=(35, 35, 40))) == "1"
+
+
+def test_gray_ink_is_gray():
+    assert readly.detect_color_mode(text_page(3, ink=(150, 150, 150))) == "L"
+
+
+def small_photo():
+    """Photo en niveaux de gris (dégradé + grain) couvrant 3 % d'une page de 1200 x 1600."""
+    gradient = Image.linear_gradient("L").resize((240, 240))
+    noise = Image.effect_noise((240, 240), 12)
+    return Image.blend(gradient, noise, 0.3).convert("RGB")
+
+
+def test_small_photo_is_gray():
+    im = text_page(6)
+    im.paste(small_photo(), (480, 680))
+    assert readly.detect_color_mode(im) == "L"
+
+
+def black_share(page):
+    im = Image.open(BytesIO(page.data)).convert("L")
+    return im.histogram()[0] / (im.width * im.height)
+
+
+def test_bilevel_threshold_keeps_dark_gray_ink():
+    rdly = readly.Readly("token")
+    black = rdly.transcode(page_from(text_page(3)))
+    dark_gray = rdly.transcode(page_from(text_page(3, paper=(236, 228, 208), ink=(100, 100, 100))))
+    assert dark_gray.format == "tiff"
+    # Le texte gris foncé garde (à peu près) la même graisse que le texte noir.
+    assert black_share(dark_gray) > 0.8 * black_share(black)
+
+
+def test_grayscale_photo_is_gray():
+    im = text_page(3)
+    ImageDraw.Draw(im).rectangle((60, 60, 1140, 800), fill=(128, 128, 128))
+    im.paste(Image.linear_gradient("L").resize((600, 400)).convert("RGB"), (100, 900))
+    assert readly.detect_color_mode(im) == "L"
+
+
+def test_color_page_is_rgb():
+    im = text_page(3)
+    ImageDraw.Draw(im).rectangle((60, 60, 600, 600), fill=(20, 128, 220))
+    assert readly.detect_color_mode(im) == "RGB"
+
+
+def page_from(im):
+    out = BytesIO()
+    im.save(out, "webp", quality=80)
+    return readly.Page("60267250adeadd000d8c86e6", 0, 1, out.getvalue(), "webp")
+
+
+def test_transcode_modes():
+    rdly = readly.Readly("token")
+    gray = text_page(3)
+    ImageDraw.Draw(gray).rectangle((60, 60, 1140, 800), fill=(128, 128, 128))
+
+    rdly.container_format = "pdf"
+    page = rdly.transcode(page_from(text_page(3)))
+    assert page.format == "tiff"
+    assert Image.open(BytesIO(page.data)).mode == "1"
+
+    rdly.container_format = "cbz"
+    page = rdly.transcode(page_from(text_page(3)))
+    assert page.format == "jpeg"
+    assert Image.open(BytesIO(page.data)).mode == "L"
+
+    # Le format WEBP ne stocke pas les niveaux de gris : la page est enregistrée (et comptée) en RGB.
+    rdly.img_format = "webp"
+    report = readly.EncodeReport()
+    page = rdly.transcode(page_from(gray), report)
+    assert Image.open(BytesIO(page.data)).mode == "RGB"
+    assert report.modes == {"RGB": 1}
+
+
+PUBLICATION_ID = "60267250adeadd000d8c86e6"
+
+
+async def serve_pages(pages, delays):
+    """Serveur local qui renvoie les pages chiffrées, avec un délai par page."""
+    from aiohttp import web
+
+    stats = {"in_flight": 0, "peak": 0, "started": 0}
+
+    async def handler(request):
+        i = int(request.match_info["i"])
+        stats["started"] += 1
+        stats["in_flight"] += 1
+        stats["peak"] = max(stats["peak"], stats["in_flight"])
+        try:
+            await asyncio.sleep(delays[i])
+        finally:
+            stats["in_flight"] -= 1
+        return web.Response(body=bytes(readly.decode_content(pages[i], PUBLICATION_ID)))
+
+    app = web.Application()
+    app.router.add_get("/p/{i}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    content = {"success": True, "content": [f"http://127.0.0.1:{port}/p/{i}" for i in range(len(pages))]}
+    return runner, content, stats
+
+
+def test_async_iter_pages_order_and_concurrency():
+    pytest.importorskip("aiohttp")
+    pages = [bytes([i]) * 1000 for i in range(30)]
+    # Les dernières pages arrivent en premier : l'ordre doit quand même être respecté.
+    delays = [0.05 - i * 0.001 for i in range(30)]
+
+    async def main():
+        runner, content, stats = await serve_pages(pages, delays)
+        try:
+            async with readly.AsyncReadly("token", concurrency=4) as rdly:
+                received = [page async for page in rdly.iter_pages(PUBLICATION_ID, content)]
+        finally:
+            await runner.cleanup()
+        return received, stats
+
+    received, stats = asyncio.run(main())
+    assert [page.index for page in received] == list(range(30))
+    assert [page.data for page in received] == pages
+    assert stats["peak"] <= 4
+
+
+def test_async_iter_pages_cancellation():
+    pytest.importorskip("aiohttp")
+    pages = [bytes([i]) * 1000 for i in range(30)]
+    delays = [0] + [10] * 29
+
+    async def main():
+        runner, content, stats = await serve_pages(pages, delays)
+        try:
+            async with readly.AsyncReadly("token", concurrency=4) as rdly:
+                iterator = rdly.iter_pages(PUBLICATION_ID, content)
+                first = await iterator.__anext__()
+                await asyncio.wait_for(iterator.aclose(), 2)
+                pending = [t for t in asyncio.all_tasks() if "download_page" in repr(t.get_coro())]
+        finally:
+            await runner.cleanup()
+        return first, pending, stats
+
+    first, pending, stats = asyncio.run(main())
+    assert first.data == pages[0]
+    assert pending == []
+    # Seules les pages de la fenêtre (`concurrency`) ont été demandées.
+    assert stats["started"] <= 5
+
+
+def test_async_connection_error_is_typed():
+    pytest.importorskip("aiohttp")
+
+    async def main():
+        async with readly.AsyncReadly("token") as rdly:
+            rdly.retries = 1
+            rdly.backoff_factor = 0
+            await rdly.download_page("http://127.0.0.1:1/p/0", PUBLICATION_ID)
+
+    with pytest.raises(readly.DownloadError):
+        asyncio.run(main())